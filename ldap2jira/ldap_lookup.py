@@ -81,9 +81,6 @@ class LDAPLookup:
         if not query_fields:
             query_fields = self.DEFAULT_QUERY_FIELDS
 
-        if not return_fields:
-            return_fields = self.DEFAULT_RETURN_FIELDS
-
         if len(query_fields) == 1:
             query_string = f'{query_fields[0]}={query}'
         else:
@@ -92,12 +89,32 @@ class LDAPLookup:
                              for field in query_fields if field]
             query_string = '(|%s)' % ''.join(field_queries)
 
-        res = self.ldap_client.search_s(
-            self.ldap_base, ldap.SCOPE_SUBTREE, query_string, return_fields)
+        res = self.search(query_string, return_fields=return_fields)
 
         if raise_exception and not res:
             raise LDAPQueryNotFoundError(f'Query not found in LDAP: {query}')
 
+        return res
+
+    def search(self,
+               query_string: str,
+               return_fields: List[str] = None,
+               ) -> List[dict]:
+        """ Perform LDAP search with a prebuilt filter string
+
+        Args:
+            query_string: LDAP filter ('(|(uid=us1)(uid=us2))')
+            return_fields: What LDAP fields to return
+
+        Returns:
+            List of dicts with LDAP results (see :meth:`query`)
+        """
+        if not return_fields:
+            return_fields = self.DEFAULT_RETURN_FIELDS
+
+        res = self.ldap_client.search_s(
+            self.ldap_base, ldap.SCOPE_SUBTREE, query_string, return_fields)
+
         # Extract first values, convert from bytes
         return [{k: v[0].decode('utf-8')
                  for k, v in record[1].items()} for record in res]
@@ -11,16 +11,31 @@ Usage:
     * Use LDAP2JiraUserMap.find_jira_accounts method
 """
 
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 import csv
 import json
 import logging
 import os
+import pickle
+import queue
+import threading
 
+from functools import lru_cache
+from itertools import chain
+from cachetools import TTLCache
 from jira import JIRA
 from ldap2jira.ldap_lookup import LDAPLookup
+from requests.adapters import HTTPAdapter
+from types import MappingProxyType
 from typing import List  # < python 3.9
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
 
 log = logging.getLogger('ldap2jira.map')
 
@@ -29,6 +44,70 @@ NO_MATCH = 0
 PARTIAL_MATCH = 1
 MATCH = 2
 
+# The only JIRA account fields the matching code reads; full
+# jira.resources.User objects are trimmed to this right after a search
+_JiraAccount = namedtuple(
+    '_JiraAccount', ['key', 'name', 'emailAddress', 'displayName'])
+
+# Pre-rendered log labels for the known match statuses
+_STATUS_LABELS = {
+    'found': 'Found',
+    'missing': 'Missing',
+    'not_in_ldap': 'Not in ldap',
+    'ambiguous': 'Ambiguous',
+}
+
+
+@lru_cache(maxsize=8)
+def _load_map_cached(filename: str, mtime: float, size: int):
+    """ Parse map file and cache result keyed by (filename, mtime, size)
+
+    Repeated calls for an unchanged file skip the disk read and parse.
+    A pickle sidecar ('<map_file>.cache.pkl') keeps the parsed map
+    across processes, so re-runs skip the JSON/CSV parse entirely.
+    Returns a read-only mapping so cached entries can't be mutated.
+
+    Raises:
+        ValueError: Map file has an unsupported extension
+    """
+    sidecar = filename + '.cache.pkl'
+
+    try:
+        with open(sidecar, 'rb') as cache_fp:
+            cached_mtime, fmap = pickle.load(cache_fp)
+
+        if cached_mtime == mtime:
+            return MappingProxyType(fmap)
+
+    except (OSError, pickle.PickleError, EOFError, ValueError):
+        pass
+
+    file_extension = os.path.splitext(filename)[1]
+
+    if file_extension == '.json':
+        with open(filename, 'rb') as map_fp:
+            if orjson:
+                fmap = orjson.loads(map_fp.read())
+            else:
+                fmap = json.load(map_fp)
+
+    elif file_extension == '.csv':
+        with open(filename, 'r') as map_fp:
+            # Streams rows straight into the dict
+            fmap = dict(csv.reader(map_fp))
+
+    else:
+        raise ValueError(f'Unsupported map file format: {filename}')
+
+    try:
+        with open(sidecar, 'wb') as cache_fp:
+            pickle.dump((mtime, fmap), cache_fp,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        log.debug("Can't write map cache: %s", sidecar)
+
+    return MappingProxyType(fmap)
+
 
 class LDAP2JiraUserMap:
     """ Finds matching JIRA accounts for given user names
@@ -60,6 +139,12 @@ class LDAP2JiraUserMap:
             Run JIRA search against those field values from LDAP
         email_domain:
             JIRA user email domain to match
+        max_workers:
+            How many worker threads to run lookups with
+            (default: ThreadPoolExecutor's default)
+        ldap_pool_size:
+            How many LDAP connections to keep for concurrent queries
+            (default: max_workers or 10)
         map_file:
             json or csv file with user mapping (username -> jira_username)
 
@@ -92,6 +177,8 @@ class LDAP2JiraUserMap:
                  ldap_fields_name: List[str],
                  ldap_fields_jira_search: List[str],
                  email_domain: str,
+                 max_workers: int = None,
+                 ldap_pool_size: int = None,
                  map_file: str = None,
                  ):
 
@@ -109,20 +196,64 @@ class LDAP2JiraUserMap:
         self.ldap_fields_name = ldap_fields_name
         self.ldap_fields_jira_search = ldap_fields_jira_search
 
+        # Prebuilt for fast dict-keys intersection in _ldap_jira_match
+        self._fields_username_set = frozenset(ldap_fields_username)
+        self._fields_mail_set = frozenset(ldap_fields_mail)
+        self._fields_name_set = frozenset(ldap_fields_name)
+
+        # Built once instead of list+set construction per LDAP query;
+        # bulk queries also need the query fields to correlate records
+        self._ldap_return_fields = frozenset(
+            chain(ldap_fields_username, ldap_fields_mail,
+                  ldap_fields_jira_search))
+        self._ldap_bulk_return_fields = (
+            self._ldap_return_fields | frozenset(ldap_query_fields_username))
+
         self.email_domain = email_domain.lstrip('@')
+        self._email_suffix = f'@{self.email_domain}'
 
-        self._ldap = None
+        self.max_workers = max_workers
+        self.ldap_pool_size = ldap_pool_size or max_workers or 10
+
+        self._ldap_pool = None
+        self._ldap_pool_lock = threading.Lock()
         self._jira = None
 
+        # Per-batch query -> Future cache shared by the worker threads
+        self._jira_search_cache = {}
+        self._jira_search_lock = threading.Lock()
+
+        # Known-missing user names; repeat batches in the same process
+        # skip lookups that already came back empty (LDAP misses are
+        # often the slowest queries).  Bounded and time-limited so
+        # newly created accounts show up eventually.
+        self._ldap_negative = TTLCache(maxsize=10_000, ttl=3600)
+        self._jira_negative = TTLCache(maxsize=10_000, ttl=3600)
+        self._negative_lock = threading.Lock()
+
         self.map_file = map_file
         self.map = {}
 
-    @property
-    def ldap(self) -> LDAPLookup:
-        if not self._ldap:
-            self._ldap = LDAPLookup(self.ldap_url, self.ldap_base)
+    @contextmanager
+    def _ldap_conn(self):
+        """ Borrow an LDAP connection from the pool
 
-        return self._ldap
+        Connections are lazily created on first use, so concurrent
+        workers run real parallel LDAP searches instead of serializing
+        through one shared connection.
+        """
+        with self._ldap_pool_lock:
+            if not self._ldap_pool:
+                self._ldap_pool = queue.Queue()
+                for _ in range(self.ldap_pool_size):
+                    self._ldap_pool.put(
+                        LDAPLookup(self.ldap_url, self.ldap_base))
+
+        conn = self._ldap_pool.get()
+        try:
+            yield conn
+        finally:
+            self._ldap_pool.put(conn)
 
     @property
     def jira(self) -> JIRA:
@@ -130,45 +261,130 @@ class LDAP2JiraUserMap:
             self._jira = JIRA(basic_auth=(self.jira_user, self.jira_password),
                               options=dict(server=self.jira_url),
                               get_server_info=False)
+
+            # Keep-alive connection pool sized for the worker threads
+            pool_size = self.max_workers or 10
+            adapter = HTTPAdapter(pool_connections=pool_size,
+                                  pool_maxsize=pool_size)
+            self._jira._session.mount('https://', adapter)
+            self._jira._session.mount('http://', adapter)
+
         return self._jira
 
     def load_map(self, filename: str = None):
         if not filename:
             return {}
 
-        if not os.path.exists(filename):
+        try:
+            file_stat = os.stat(filename)
+        except OSError:
             log.warning("Map file doesn't exist: %s", filename)
             return {}
 
-        file_extension = os.path.splitext(filename)[1]
-        fmap = {}
+        return _load_map_cached(
+            filename, file_stat.st_mtime, file_stat.st_size)
 
-        with open(filename, 'r') as map_fp:
-            if file_extension == '.json':
-                fmap = json.load(map_fp)
+    def ldap_query(self, query: str):
+        with self._ldap_conn() as conn:
+            return conn.query(
+                query,
+                query_fields=self.ldap_query_fields_username,
+                return_fields=self._ldap_return_fields
+            )
+
+    def ldap_bulk_query(self,
+                        usernames: List[str],
+                        chunk: int = 200
+                        ) -> dict:
+        """ Query LDAP for many user names at once
+
+        Combines user names into OR filters
+        ('(|(uid=us1)(uid=us2)...)') and issues one LDAP search per
+        query field per chunk instead of one search per user name.
+
+        Args:
+            usernames: List of user names
+            chunk: How many user names to combine into one query
+
+        Returns:
+            A dict with user names as keys and lists of their LDAP
+            records as values (no key for user names without a record,
+            several records mean an ambiguous LDAP match)
+        """
+        accounts = {}
 
-            if file_extension == '.csv':
-                fmap = {val_list[0]: val_list[1]
-                        for val_list in csv.reader(map_fp)}
+        for username, records in self._iter_ldap_bulk(usernames, chunk):
+            if records:
+                accounts[username] = records
 
-        return fmap
+        return accounts
 
-    def ldap_query(self, query: str):
-        return_fields = set(
-            self.ldap_fields_username
-            + self.ldap_fields_mail
-            + self.ldap_fields_jira_search
-        )
-
-        return self.ldap.query(
-            query,
-            query_fields=self.ldap_query_fields_username,
-            return_fields=return_fields
-        )
+    def _iter_ldap_bulk(self, usernames: List[str], chunk: int = 200):
+        """ Yield (username, ldap_records) tuples chunk by chunk
+
+        Generator behind :meth:`ldap_bulk_query` - each chunk is
+        yielded as soon as its LDAP searches return, so callers can
+        process records while the next chunk is still being fetched.
+        """
+        return_fields = self._ldap_bulk_return_fields
+
+        with self._ldap_conn() as conn:
+
+            for start in range(0, len(usernames), chunk):
+                batch = usernames[start:start + chunk]
+                batch_set = set(batch)
+                accounts = {}
+
+                for field in self.ldap_query_fields_username:
+                    field_queries = [f'({field}={username})'
+                                     for username in batch]
+                    query_string = '(|%s)' % ''.join(field_queries)
+
+                    for record in conn.search(query_string, return_fields):
+                        username = record.get(field)
+
+                        if username not in batch_set:
+                            log.debug(
+                                'Dropping unrequested LDAP record: %s',
+                                username)
+                            continue
+
+                        records = accounts.setdefault(username, [])
+                        if record not in records:
+                            records.append(record)
+
+                for username in batch:
+                    yield username, accounts.get(username, [])
 
     def jira_search_user(self, query: str):
-        log.info('Jira search for: %s', query)
-        return self.jira.search_users(query, maxResults=10)
+        """ Search JIRA users, collapsing duplicate queries within a batch
+
+        The first caller for a query issues the REST call; concurrent
+        callers with the same query block on its Future instead of
+        issuing duplicate requests.
+        """
+        with self._jira_search_lock:
+            future = self._jira_search_cache.get(query)
+            owner = future is None
+
+            if owner:
+                future = Future()
+                self._jira_search_cache[query] = future
+
+        if owner:
+            log.info('Jira search for: %s', query)
+            try:
+                future.set_result([
+                    _JiraAccount(getattr(account, 'key', None),
+                                 getattr(account, 'name', None),
+                                 getattr(account, 'emailAddress', None),
+                                 getattr(account, 'displayName', None))
+                    for account
+                    in self.jira.search_users(query, maxResults=10)])
+            except Exception as e:
+                future.set_exception(e)
+
+        return future.result()
 
     def _ldap_jira_match(self,
                          ldap_account: dict,
@@ -183,44 +399,51 @@ class LDAP2JiraUserMap:
         Returns:
             Either MATCH, PARTIAL_MATCH, NO_MATCH
         """
-        try:
-            jira_username = jira_account.key
-            jira_email = jira_account.emailAddress
-            jira_names = {jira_account.name, jira_account.displayName}
+        jira_username = jira_account.key
+        jira_email = jira_account.emailAddress
+        jira_names = {jira_account.name, jira_account.displayName}
 
-        except AttributeError as e:
-            log.warning('Unable to get JIRA account values\n%s', e)
+        if not jira_email or None in jira_names:
+            log.warning('Unable to get JIRA account values for: %s',
+                        jira_username)
             return NO_MATCH
 
-        log.debug('Trying JIRA account: %s [%s] %s',
-                  jira_account.displayName, jira_username, jira_email)
+        # Even lazy %-formatting pays logging machinery per call;
+        # check once for the whole comparison
+        debug_enabled = log.isEnabledFor(logging.DEBUG)
+
+        if debug_enabled:
+            log.debug('Trying JIRA account: %s [%s] %s',
+                      jira_account.displayName, jira_username, jira_email)
 
-        if jira_email.endswith(f'@{self.email_domain}'):
+        if jira_email.endswith(self._email_suffix):
+
+            ldap_keys = ldap_account.keys()
 
             ldap_emails = {ldap_account[f]
-                           for f in self.ldap_fields_mail
-                           if f in ldap_account}
+                           for f in ldap_keys & self._fields_mail_set}
 
             ldap_usernames = {ldap_account[f]
-                              for f in self.ldap_fields_username
-                              if f in ldap_account}
+                              for f in ldap_keys & self._fields_username_set}
 
             email_match = jira_email in ldap_emails
             username_match = jira_username in ldap_usernames
 
             if email_match or username_match:
-                log.debug('Match')
+                if debug_enabled:
+                    log.debug('Match')
                 return MATCH
 
             ldap_names = {ldap_account[f]
-                          for f in self.ldap_fields_name
-                          if f in ldap_account}
+                          for f in ldap_keys & self._fields_name_set}
 
             if jira_names & ldap_names:
-                log.debug('Partial Match')
+                if debug_enabled:
+                    log.debug('Partial Match')
                 return PARTIAL_MATCH
 
-        log.debug('No Match')
+        if debug_enabled:
+            log.debug('No Match')
         return NO_MATCH
 
     def _update_user(self,
@@ -233,38 +456,64 @@ class LDAP2JiraUserMap:
         """ Update common user dict and log result """
         user_dict['status'] = status
 
-        log_msg = (
-            "JIRA account - "
-            f"{status.replace('_', ' ').capitalize()}: {username}\n")
+        if not log.isEnabledFor(level):
+            return
+
+        label = (_STATUS_LABELS.get(status)
+                 or status.replace('_', ' ').capitalize())
+
+        log_msg = f"JIRA account - {label}: {username}\n"
         log_msg += log_extra + '\n' if log_extra else ''
         log.log(level, log_msg)
 
-    def _process_username(self, username: str) -> dict:
+    def reset_caches(self):
+        """ Forget cached negative LDAP/JIRA lookup results """
+        with self._negative_lock:
+            self._ldap_negative.clear()
+            self._jira_negative.clear()
+
+    def _map_user(self, username: str) -> dict:
+        """ Build match result for a user name found in the file map """
+        user_dict = {}
+
+        self._update_user(user_dict,
+                          self.map[username],
+                          'found',
+                          log_extra='File Map',
+                          level=logging.INFO)
+        user_dict['jira-account'] = self.map[username]
+
+        return user_dict
+
+    def _process_username(self,
+                          username: str,
+                          ldap_results: List[dict]
+                          ) -> dict:
         """ Process single username
 
         Multithreaded worker method
-        """
-        user_dict = {'username': username}
 
-        if not username:
-            return user_dict
+        Args:
+            username: User name to process
+            ldap_results: Pre-fetched LDAP records for the user name
 
-        log.info('Process username: %s', username)
+        Returns:
+            Match result dict for the user name
+        """
+        user_dict = {}
 
-        # Try file map
-        if username in self.map:
-            self._update_user(user_dict,
-                              self.map[username],
-                              'found',
-                              log_extra='File Map',
-                              level=logging.INFO)
-            user_dict['jira-account'] = self.map[username]
-            return user_dict
+        log.info('Process username: %s', username)
 
-        # No luck - continue
-        ldap_results = self.ldap_query(username)
+        # Bulk pre-fetch only correlates exact field values; fall back
+        # to a single query for user names it couldn't attribute
+        # (e.g. wildcard matches on multiple query fields)
+        if not ldap_results:
+            ldap_results = self.ldap_query(username)
 
         if not ldap_results:
+            with self._negative_lock:
+                self._ldap_negative[username] = True
+
             self._update_user(user_dict, username, 'not_in_ldap')
             return user_dict
 
@@ -293,9 +542,14 @@ class LDAP2JiraUserMap:
         jira_account_keys = set()
         partial_single_matches = []  # Need order of preference
 
+        # Hoisted out of the hot loop - saves an attribute load per
+        # JIRA account compared
+        jira_search_user = self.jira_search_user
+        ldap_jira_match = self._ldap_jira_match
+
         for query in jira_queries:
 
-            result_jira_accounts = self.jira_search_user(query)
+            result_jira_accounts = jira_search_user(query)
             single_result = len(result_jira_accounts) == 1
             for jira_account in result_jira_accounts:
                 if jira_account.key in jira_account_keys and not single_result:
@@ -303,7 +557,7 @@ class LDAP2JiraUserMap:
 
                 jira_account_keys.add(jira_account.key)
 
-                match = self._ldap_jira_match(ldap_account, jira_account)
+                match = ldap_jira_match(ldap_account, jira_account)
                 if match == MATCH:
                     self._update_user(user_dict,
                                       jira_account.key,
@@ -321,6 +575,9 @@ class LDAP2JiraUserMap:
                 break
 
         if not jira_account_keys:
+            with self._negative_lock:
+                self._jira_negative[username] = True
+
             self._update_user(user_dict, username, 'missing')
             return user_dict
 
@@ -382,19 +639,51 @@ class LDAP2JiraUserMap:
         """
         users = {}
 
-        self.map.update(self.load_map(self.map_file))
+        fmap = self.load_map(self.map_file)
+        if fmap:
+            self.map = fmap
 
-        with ThreadPoolExecutor(thread_name_prefix='W') as executor:
+        self._jira_search_cache.clear()
 
-            f_users_d = {executor.submit(self._process_username, username)
-                         for username in usernames}
+        # File map hits are trivial - answer them inline and keep the
+        # executor for user names that need LDAP/JIRA lookups
+        lookup_usernames = []
 
-            for f_user_d in as_completed(f_users_d):
-                user_d = f_user_d.result()
+        # Results are keyed by user name, so duplicate and empty
+        # entries would only repeat the same expensive lookups
+        for username in dict.fromkeys(u for u in usernames if u):
+            if username in self.map:
+                users[username] = self._map_user(username)
+
+            elif username in self._ldap_negative:
+                users[username] = user_d = {}
+                self._update_user(user_d, username, 'not_in_ldap')
+
+            elif username in self._jira_negative:
+                users[username] = user_d = {}
+                self._update_user(user_d, username, 'missing')
 
-                username = user_d.pop('username')
+            else:
+                lookup_usernames.append(username)
+
+        # Create the shared JIRA client before workers race to do it
+        self.jira
+
+        with ThreadPoolExecutor(max_workers=self.max_workers,
+                                thread_name_prefix='W') as executor:
+
+            # Submitting as each bulk LDAP chunk returns lets the JIRA
+            # lookups overlap with the remaining LDAP fetches
+            f_users_d = {
+                executor.submit(self._process_username, username,
+                                ldap_records): username
+                for username, ldap_records
+                in self._iter_ldap_bulk(lookup_usernames)}
+
+            for f_user_d in as_completed(f_users_d):
+                users[f_users_d[f_user_d]] = f_user_d.result()
 
-                if username:
-                    users[username] = user_d
+        # Queries don't repeat across batches; don't hold results forever
+        self._jira_search_cache.clear()
 
         return users
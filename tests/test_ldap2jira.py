@@ -128,6 +128,9 @@ class LDAP2JiraTestCase(LdapMockTestCaseBase):
         self.map._jira.search_users = MagicMock()
         self.mock_jira_search = self.map._jira.search_users
 
+        # Negative caches persist across batches - keep tests isolated
+        self.map.reset_caches()
+
     def test_jira_match(self, mock_ldap):
         mock_ldap.return_value = [self.ldap_mock_results[1]]
         self.mock_jira_search.return_value = [self.jira_accounts_mock[1]]
@@ -160,6 +163,20 @@ class LDAP2JiraTestCase(LdapMockTestCaseBase):
                 {'us2': {'status': 'not_in_ldap'}}
             )
 
+    def test_jira_not_in_ldap_cached(self, mock_ldap):
+        mock_ldap.return_value = []
+
+        for _ in range(2):
+            with self.assertLogs('ldap2jira.map', level='WARNING'):
+
+                self.assertDictEqual(
+                    self.map.find_jira_accounts(['us2']),
+                    {'us2': {'status': 'not_in_ldap'}}
+                )
+
+        # Bulk query plus fallback on the first batch, none on repeat
+        self.assertEqual(mock_ldap.call_count, 2)
+
     def test_jira_missing(self, mock_ldap):
         mock_ldap.return_value = [self.ldap_mock_results[1]]
 